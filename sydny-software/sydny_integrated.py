@@ -6,20 +6,225 @@ Combines voice recognition, TTS, and HAL-inspired GUI with FULL command support
 import sys
 import os
 import json
+import re
 import threading
-from queue import Queue
+import time
+import traceback
+from functools import lru_cache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+from queue import Queue, Empty
 
 # PyQt5 imports
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QTextEdit
-from PyQt5.QtCore import Qt, QTimer, QPoint, pyqtSignal, QObject
+from PyQt5.QtCore import Qt, QTimer, QPoint, QRect, pyqtSignal, QObject
 from PyQt5.QtGui import QPainter, QColor, QPen, QRadialGradient, QFont
 
 # Voice imports
 import vosk
-import pyaudio
-import subprocess
+import sounddevice as sd
 import windows_system
 import task_system
+import tts_system
+import vosk_worker
+
+# Optional: faster JSON decoding for recognizer results
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Optional: voice activity detection (without it every chunk goes to Vosk)
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+# Optional: faster-whisper (int8 CTranslate2) recognizer, used instead of Vosk when VAD is available
+try:
+    import numpy as np
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+# Speech recognition model (relative to the working directory)
+VOSK_MODEL_PATH = "vosk-model-small-en-us-0.15"
+
+# Decode in a separate process (vosk_worker) so the GUI never waits on the GIL
+RECOGNIZER_PROCESS = True
+
+# Audio capture settings
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 1600  # Frames per audio callback (100 ms, whole number of 20 ms VAD frames)
+AUDIO_RING_SIZE = 80  # Blocks buffered between capture and recognition (8 s)
+
+# One second of silence, decoded once at startup so Kaldi's lazy setup is done before the first command
+WARMUP_SILENCE = b"\x00\x00" * SAMPLE_RATE
+
+# Seconds to wait for CONFIRM/CANCEL before treating it as cancelled
+CONFIRM_TIMEOUT = 30
+
+# Main loop error handling: pause after each error, give up after this many in a row
+ERROR_BACKOFF = 0.05
+MAX_ERROR_STREAK = 20
+
+# Voice activity detection settings
+VAD_AGGRESSIVENESS = 2  # 0 (permissive) - 3 (strict)
+VAD_FRAME_BYTES = 640  # 20 ms of 16-bit mono audio
+VAD_HANGOVER_MS = 500  # Silence after speech before the utterance is closed
+VAD_HANGOVER_CHUNKS = max(1, VAD_HANGOVER_MS * SAMPLE_RATE // (1000 * BLOCK_FRAMES))
+
+# What Vosk's Result() / PartialResult() contain when nothing was recognized
+EMPTY_RESULT_TEXT = '"text" : ""'
+EMPTY_PARTIAL_TEXT = '"partial" : ""'
+
+# Live transcript in the status line while the user is speaking
+PARTIAL_INTERVAL = 0.1  # At most 10 updates per second
+PARTIAL_MAX_CHARS = 40
+
+# faster-whisper settings
+WHISPER_MODEL = "tiny.en"
+WHISPER_MAX_BYTES = 15 * SAMPLE_RATE * 2  # Transcribe at most 15 s of speech at once
+WHISPER_PUNCTUATION_RE = re.compile(r"[^\w\s']")
+
+# Command vocabulary (built once, looked up per word)
+FILLER_WORDS = frozenset({
+    "please", "could", "you", "can", "would", "will",
+    "up", "the", "a", "an", "for", "me", "my"
+})
+
+# Keyword classes - one bit each, so a transcript is classified in one pass
+OPEN = 1 << 0
+FILE = 1 << 1
+CLOSE = 1 << 2
+SEARCH = 1 << 3
+DELETE = 1 << 4
+VOLUME = 1 << 5
+MUTE = 1 << 6
+UNMUTE = 1 << 7
+SHUTDOWN = 1 << 8
+RESTART = 1 << 9
+SLEEP = 1 << 10
+TASK = 1 << 11
+ADD = 1 << 12
+LIST = 1 << 13
+ALL = 1 << 14
+COMPLETE = 1 << 15
+REMOVE = 1 << 16
+HIGH = 1 << 17
+LOW = 1 << 18
+PRIORITY = 1 << 19
+HOW = 1 << 20
+MANY = 1 << 21
+COUNT = 1 << 22
+EXIT = 1 << 23
+
+KEYWORDS = {
+    "open": OPEN, "file": FILE, "close": CLOSE,
+    "search": SEARCH, "find": SEARCH, "delete": DELETE,
+    "volume": VOLUME, "mute": MUTE, "unmute": UNMUTE,
+    "shutdown": SHUTDOWN, "shut": SHUTDOWN, "restart": RESTART, "sleep": SLEEP,
+    "task": TASK, "tasks": TASK,
+    "add": ADD, "create": ADD, "new": ADD,
+    "list": LIST, "show": LIST, "what": LIST,
+    "all": ALL, "completed": ALL,
+    "complete": COMPLETE, "finish": COMPLETE, "done": COMPLETE,
+    "remove": REMOVE, "cancel": REMOVE,
+    "high": HIGH, "important": HIGH, "urgent": HIGH,
+    "low": LOW, "priority": PRIORITY,
+    "how": HOW, "many": MANY, "count": COUNT,
+    "exit": EXIT, "quit": EXIT,
+}
+
+def _trie_pattern(words):
+    """
+    Build a regex alternation factored by shared prefixes ("c(?:lose|o(?:mplete...")
+    so the engine follows one branch per character instead of retrying every word
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = None  # A word ends here
+    
+    def build(node):
+        ends = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if ends else group
+    
+    return build(trie)
+
+# Every keyword in one whole-word prefix trie, so a transcript is scanned once in C
+KEYWORD_RE = re.compile(r"(?<!\S)(?:" + _trie_pattern(KEYWORDS) + r")(?!\S)")
+
+# Commands that need a target, in priority order:
+# (keywords that must all be present, intent, keywords stripped from the target)
+TARGET_COMMANDS = (
+    (OPEN | FILE, "openfile", OPEN | FILE),
+    (OPEN, "open", OPEN),
+    (CLOSE, "close", CLOSE),
+    (SEARCH, "search", SEARCH | FILE),
+    (DELETE, "delete", DELETE | FILE),
+)
+
+# Commands without a target, in priority order
+SIMPLE_COMMANDS = (
+    (MUTE, "mute"),
+    (UNMUTE, "unmute"),
+    (SHUTDOWN, "shutdown"),
+    (RESTART, "restart"),
+    (SLEEP, "sleep"),
+)
+
+# Seconds the voice must be idle before the next fixed prompt is rendered
+PROMPT_WARM_IDLE = 1.0
+
+# Fixed responses, played from pre-rendered WAV files instead of live TTS
+# (spoken live until their file has been rendered in the background)
+FIXED_PROMPTS = frozenset({
+    "My name is Sydney, how's it going?",
+    "Goodbye",
+    "Shutting down",
+    "Volume must be between 0 and 100",
+    "Please specify a valid number for volume",
+    "Please specify a volume level",
+    "Error muting audio",
+    "Error unmuting audio",
+    "Shutdown cancelled",
+    "Error with shutdown command",
+    "Restart cancelled",
+    "Error with restart command",
+    "Sleep cancelled",
+    "Error with sleep command",
+    "What would you like me to open?",
+    "What would you like me to close?",
+    "Searching",
+    "Error searching for file",
+    "What file would you like me to search for?",
+    "Delete cancelled",
+    "Error deleting file",
+    "What file would you like me to delete?",
+    "Error opening file",
+    "What file would you like me to open?",
+    "Error adding task",
+    "What task would you like to add?",
+    "You have no tasks",
+    "Error listing tasks",
+    "Please specify a valid task number",
+    "Error completing task",
+    "Which task number would you like to complete?",
+    "Error deleting task",
+    "Which task number would you like to delete?",
+    "Error counting tasks",
+})
 
 # ============================================================================
 # SIGNAL EMITTER (for thread-safe GUI updates)
@@ -40,6 +245,10 @@ class Signals(QObject):
 # EYE WIDGET
 # ============================================================================
 
+EYE_RING_RADIUS = 180
+EYE_GLOW_RADIUS = EYE_RING_RADIUS - 20
+GLOW_LEVELS = 32  # Gradient cache buckets for glow intensity
+
 class EyeWidget(QWidget):
     """The HAL 9000 red eye"""
     def __init__(self):
@@ -48,25 +257,61 @@ class EyeWidget(QWidget):
         self.glow_intensity = 0.5
         self.is_speaking = False
         
+        # Only runs while speaking - the idle eye is static
         self.timer = QTimer()
         self.timer.timeout.connect(self.animate_glow)
-        self.timer.start(50)
         
         self.glow_direction = 1
+        
+        # Glow gradients by intensity bucket (cleared when the center moves)
+        self._gradient_cache = {}
     
     def animate_glow(self):
-        if self.is_speaking:
-            self.glow_intensity += 0.05 * self.glow_direction
-            if self.glow_intensity >= 1.0:
-                self.glow_direction = -1
-            elif self.glow_intensity <= 0.3:
-                self.glow_direction = 1
-        else:
-            self.glow_intensity = 0.5
-        self.update()
+        if not self.is_speaking:
+            return
+        self.glow_intensity += 0.05 * self.glow_direction
+        if self.glow_intensity >= 1.0:
+            self.glow_direction = -1
+        elif self.glow_intensity <= 0.3:
+            self.glow_direction = 1
+        # Only the glow changes - leave the ring and background alone
+        self.update(self._glow_rect())
+    
+    def _glow_rect(self):
+        """Area covered by the animated glow"""
+        return QRect(
+            self.width() // 2 - EYE_GLOW_RADIUS,
+            self.height() // 2 - EYE_GLOW_RADIUS,
+            2 * EYE_GLOW_RADIUS,
+            2 * EYE_GLOW_RADIUS
+        )
+    
+    def _glow_gradient(self, center):
+        """Get the glow gradient for the current intensity, building it on first use"""
+        level = int(self.glow_intensity * GLOW_LEVELS)
+        gradient = self._gradient_cache.get(level)
+        if gradient is None:
+            gradient = QRadialGradient(center, EYE_GLOW_RADIUS)
+            intensity = min(255, int(255 * level / GLOW_LEVELS))
+            gradient.setColorAt(0, QColor(255, intensity, 0, 255))
+            gradient.setColorAt(0.3, QColor(255, 0, 0, 200))
+            gradient.setColorAt(0.7, QColor(150, 0, 0, 150))
+            gradient.setColorAt(1, QColor(0, 0, 0, 0))
+            self._gradient_cache[level] = gradient
+        return gradient
+    
+    def resizeEvent(self, event):
+        self._gradient_cache.clear()
+        super().resizeEvent(event)
     
     def set_speaking(self, speaking):
         self.is_speaking = speaking
+        if speaking and not self.timer.isActive():
+            self.timer.start(50)
+        elif not speaking and self.timer.isActive():
+            self.timer.stop()
+            self.glow_intensity = 0.5
+            self.update(self._glow_rect())
     
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -76,21 +321,13 @@ class EyeWidget(QWidget):
         center_y = self.height() // 2
         center = QPoint(center_x, center_y)
         
-        ring_radius = 180
         painter.setPen(QPen(QColor(150, 150, 150), 14))
         painter.setBrush(Qt.NoBrush)
-        painter.drawEllipse(center, ring_radius, ring_radius)
-        
-        gradient = QRadialGradient(center, ring_radius - 20)
-        intensity = int(255 * self.glow_intensity)
-        gradient.setColorAt(0, QColor(255, intensity, 0, 255))
-        gradient.setColorAt(0.3, QColor(255, 0, 0, 200))
-        gradient.setColorAt(0.7, QColor(150, 0, 0, 150))
-        gradient.setColorAt(1, QColor(0, 0, 0, 0))
+        painter.drawEllipse(center, EYE_RING_RADIUS, EYE_RING_RADIUS)
         
-        painter.setBrush(gradient)
+        painter.setBrush(self._glow_gradient(center))
         painter.setPen(Qt.NoPen)
-        painter.drawEllipse(center, ring_radius - 20, ring_radius - 20)
+        painter.drawEllipse(center, EYE_GLOW_RADIUS, EYE_GLOW_RADIUS)
         
         core_size = int(25 * self.glow_intensity)
         painter.setBrush(QColor(255, 255, 200, 200))
@@ -101,6 +338,9 @@ class EyeWidget(QWidget):
 # TERMINAL DISPLAY WIDGET
 # ============================================================================
 
+TERMINAL_MAX_LINES = 500  # Older lines are dropped
+TERMINAL_FLUSH_MS = 30  # Messages arriving within this window are drawn together
+
 class TerminalWidget(QTextEdit):
     """Terminal-style scrolling display for conversation"""
     def __init__(self):
@@ -113,6 +353,17 @@ class TerminalWidget(QTextEdit):
         # Make it read-only
         self.setReadOnly(True)
         
+        # Bound memory and layout cost over long sessions
+        self.setUndoRedoEnabled(False)
+        self.document().setMaximumBlockCount(TERMINAL_MAX_LINES)
+        
+        # Batch rapid messages into one update
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(TERMINAL_FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush_pending)
+        
         # Set terminal styling
         self.setStyleSheet("""
             QTextEdit {
@@ -130,26 +381,42 @@ class TerminalWidget(QTextEdit):
         self.setFont(font)
     
     def add_message(self, message):
-            """Add a message to the terminal and auto-scroll with color support"""
-            # Check if this is a task line
-            if message.startswith("✓"):
-                # Completed task - green checkmark, gray text
-                self.setTextColor(QColor(0, 255, 0))  # Green for checkmark
-                self.insertPlainText("✓")
-                self.setTextColor(QColor(150, 150, 150))  # Gray for rest
-                self.insertPlainText(message[1:] + "\n")
-            elif message.startswith("○"):
-                # Active task - white
-                self.setTextColor(QColor(255, 255, 255))  # White
-                self.append(message)
-            else:
-                # Regular message - default green
-                self.setTextColor(QColor(0, 255, 0))  # Green
-                self.append(message)
-            
-            # Auto-scroll to bottom
-            scrollbar = self.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+        """Queue a message for the terminal (written on the next batch flush)"""
+        # Multi-line messages arrive as one signal but are colored line by line
+        self._pending.extend(message.split("\n"))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def _flush_pending(self):
+        """Write all queued messages as one edit and auto-scroll once"""
+        cursor = self.textCursor()
+        cursor.beginEditBlock()
+        for message in self._pending:
+            self._write_message(message)
+        cursor.endEditBlock()
+        self._pending.clear()
+        
+        # Auto-scroll to bottom
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    
+    def _write_message(self, message):
+        """Write one message with color support"""
+        # Check if this is a task line
+        if message.startswith("✓"):
+            # Completed task - green checkmark, gray text
+            self.setTextColor(QColor(0, 255, 0))  # Green for checkmark
+            self.insertPlainText("✓")
+            self.setTextColor(QColor(150, 150, 150))  # Gray for rest
+            self.insertPlainText(message[1:] + "\n")
+        elif message.startswith("○"):
+            # Active task - white
+            self.setTextColor(QColor(255, 255, 255))  # White
+            self.append(message)
+        else:
+            # Regular message - default green
+            self.setTextColor(QColor(0, 255, 0))  # Green
+            self.append(message)
     
     def clear(self):
         """Clear all messages"""
@@ -174,7 +441,12 @@ class SydnyGUI(QMainWindow):
         self.signals.hide_confirmation.connect(self.hide_confirmation)
         self.signals.close_window.connect(self.close)  # Close the window
         
-        self.confirmation_response = Queue()
+        # Single-slot confirm/cancel handoff to the voice thread
+        # Clicks only count while a prompt is armed, so a late click can't answer the next one
+        self._confirm_lock = threading.Lock()
+        self._confirm_armed = False
+        self._confirm_evt = threading.Event()
+        self._confirm_result = False
         
         self.init_ui()
     
@@ -285,7 +557,11 @@ class SydnyGUI(QMainWindow):
             self.status_label.setText("SYDNY")
     
     def show_confirmation(self, prompt):
-        """Show confirmation buttons"""
+        """Show confirmation buttons and start accepting an answer"""
+        with self._confirm_lock:
+            self._confirm_result = False
+            self._confirm_evt.clear()
+            self._confirm_armed = True
         self.status_label.setText(prompt)
         self.confirm_button.show()
         self.cancel_button.show()
@@ -295,492 +571,760 @@ class SydnyGUI(QMainWindow):
         self.confirm_button.hide()
         self.cancel_button.hide()
     
+    def _answer_confirmation(self, confirmed):
+        """Hand a click to the waiting voice thread (ignored if no prompt is armed)"""
+        with self._confirm_lock:
+            if self._confirm_armed:
+                self._confirm_armed = False
+                self._confirm_result = confirmed
+                self._confirm_evt.set()
+        self.hide_confirmation()
+    
     def on_confirm(self):
         """User clicked confirm"""
-        self.confirmation_response.put(True)
-        self.hide_confirmation()
+        self._answer_confirmation(True)
     
     def on_cancel(self):
         """User clicked cancel"""
-        self.confirmation_response.put(False)
-        self.hide_confirmation()
+        self._answer_confirmation(False)
+    
+    def wait_for_confirmation(self, timeout=CONFIRM_TIMEOUT):
+        """
+        Block the calling (voice) thread until CONFIRM or CANCEL is clicked
+        Returns: True if confirmed, False if cancelled or timed out
+        """
+        answered = self._confirm_evt.wait(timeout)
+        with self._confirm_lock:
+            # Disarm before returning, so a click after a timeout is ignored
+            confirmed = answered and self._confirm_result
+            self._confirm_armed = False
+            self._confirm_result = False
+            self._confirm_evt.clear()
+        return confirmed
+
+
+# ============================================================================
+# COMMAND TABLE
+# ============================================================================
+
+@dataclass(frozen=True)
+class HandlerSpec:
+    """A command that calls one function and speaks the message it returns"""
+    fn: Callable
+    error: str  # Spoken if fn raises ({target} is filled in)
+    needs_target: bool = False  # Pass the target to fn
+    missing_target: Optional[str] = None  # Spoken if the target is missing
+    confirm: Optional[str] = None  # GUI confirmation prompt shown first
+    cancelled: Optional[str] = None  # Spoken if the confirmation is cancelled
+
+
+SIMPLE_HANDLERS = {
+    "mute": HandlerSpec(windows_system.mute, "Error muting audio"),
+    "unmute": HandlerSpec(windows_system.unmute, "Error unmuting audio"),
+    "shutdown": HandlerSpec(
+        windows_system.shutdown_system, "Error with shutdown command",
+        confirm="Confirm shutdown?", cancelled="Shutdown cancelled"
+    ),
+    "restart": HandlerSpec(
+        windows_system.restart_system, "Error with restart command",
+        confirm="Confirm restart?", cancelled="Restart cancelled"
+    ),
+    "sleep": HandlerSpec(
+        windows_system.sleep_system, "Error with sleep command",
+        confirm="Confirm sleep?", cancelled="Sleep cancelled"
+    ),
+    "open": HandlerSpec(
+        windows_system.open_app, "Error opening {target}",
+        needs_target=True, missing_target="What would you like me to open?"
+    ),
+    "close": HandlerSpec(
+        windows_system.close_app, "Error closing {target}",
+        needs_target=True, missing_target="What would you like me to close?"
+    ),
+}
+
+
+# ============================================================================
+# COMMAND PARSING
+# ============================================================================
+
+def _strip_keywords(words, mask):
+    """Join the words whose keyword class is not in mask"""
+    return " ".join(w for w in words if not KEYWORDS.get(w, 0) & mask)
+
+def _first_number(words):
+    """Return the first all-digit word, or None"""
+    return next((w for w in words if w.isdigit()), None)
+
+@lru_cache(maxsize=512)
+def parse_text(text):
+    """
+    Parse natural language command into intent and target
+    Pure function of the text, so repeated commands come straight from the cache
+    Returns: (intent, target) or (None, None) if no command found
+    """
+    try:
+        text = text.lower()
+        
+        # One regex scan finds every keyword; only those reach Python code
+        flags = 0
+        for match in KEYWORD_RE.finditer(text):
+            flags |= KEYWORDS[match.group()]
+        if not flags:
+            return (None, None)
+        
+        words = [w for w in text.split() if w not in FILLER_WORDS]
+        
+        # First matching target command wins; an empty target means no command
+        for required, intent, strip in TARGET_COMMANDS:
+            if flags & required == required:
+                target = _strip_keywords(words, strip)
+                if target:
+                    return (intent, target)
+                return (None, None)
+        
+        # Check for "volume" commands
+        if flags & VOLUME:
+            return ("volume", _first_number(words))
+        
+        for required, intent in SIMPLE_COMMANDS:
+            if flags & required:
+                return (intent, None)
+        
+        # Check for task commands
+        if flags & TASK:
+            # ADD TASK
+            if flags & ADD:
+                # Check for priority
+                priority = "normal"
+                strip = ADD | TASK
+                if flags & HIGH:
+                    priority = "high"
+                    strip |= HIGH | PRIORITY
+                elif flags & LOW:
+                    priority = "low"
+                    strip |= LOW | PRIORITY
+                
+                description = _strip_keywords(words, strip)
+                if description:
+                    return ("addtask", f"{description}|{priority}")
+                else:
+                    return ("addtask", None)
+            
+            # LIST TASKS
+            if flags & LIST:
+                if flags & ALL:
+                    return ("listalltasks", None)
+                else:
+                    return ("listtasks", None)
+            
+            # COMPLETE TASK
+            if flags & COMPLETE:
+                return ("completetask", _first_number(words))
+            
+            # DELETE TASK
+            if flags & (DELETE | REMOVE):
+                return ("deletetask", _first_number(words))
+        
+        # TASK COUNT
+        if (flags & HOW and flags & MANY) or flags & COUNT:
+            if flags & TASK:
+                return ("taskcount", None)
+        
+        if flags & EXIT:
+            return ("exit", None)
+        
+        return (None, None)
+    
+    except Exception as e:
+        print(f"Error parsing command: {e}")
+        return (None, None)
 
 
 # ============================================================================
 # VOICE SYSTEM (runs in separate thread)
 # ============================================================================
 
+# Loaded Vosk models by path, so a new VoiceSystem doesn't reload the model from disk
+_vosk_models = {}
+
+def get_vosk_model(path=VOSK_MODEL_PATH):
+    """Load a Vosk model once per process and reuse it"""
+    model = _vosk_models.get(path)
+    if model is None:
+        model = _vosk_models[path] = vosk.Model(path)
+    return model
+
+
 class VoiceSystem:
     """Voice recognition and TTS system"""
     
-    def __init__(self, gui_signals, confirmation_queue):
+    def __init__(self, gui_signals, wait_for_confirmation):
         self.signals = gui_signals
-        self.confirmation_queue = confirmation_queue
+        self.wait_for_confirmation = wait_for_confirmation
         
-        # Set up Vosk model
-        model_path = "vosk-model-small-en-us-0.15"
-        if not os.path.exists(model_path):
-            print(f"Model not found at {model_path}")
-            sys.exit(1)
-        
-        print("Loading Vosk model...")
-        try:
-            self.model = vosk.Model(model_path)
-        except Exception as e:
-            print(f"Error loading Vosk model: {e}")
+        # Check for the Vosk model (loading it is slow, so that happens in the background)
+        if not os.access(VOSK_MODEL_PATH, os.F_OK):
+            print(f"Model not found at {VOSK_MODEL_PATH}")
             sys.exit(1)
         
-        # Set up PyAudio
+        # Set up microphone (PortAudio fills blocks on its own thread via the callback)
         try:
-            self.mic = pyaudio.PyAudio()
-            self.stream = self.mic.open(
-                format=pyaudio.paInt16,
+            self.stream = sd.RawInputStream(
+                samplerate=SAMPLE_RATE,
+                blocksize=BLOCK_FRAMES,
+                dtype='int16',
                 channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=8000
+                callback=self._audio_callback
             )
-            self.stream.start_stream()
         except Exception as e:
             print(f"Error setting up microphone: {e}")
             sys.exit(1)
         
-        # Create Vosk recognizer
-        self.rec = vosk.KaldiRecognizer(self.model, 16000)
+        # Speech gate in front of the recognizer
+        self.vad = webrtcvad.Vad(VAD_AGGRESSIVENESS) if webrtcvad else None
+        self.in_speech = False
+        self.silent_chunks = 0
+        
+        # Load recognizer models while the GUI comes up (run() waits for them)
+        self.model = None
+        self.rec = None
+        self.last_partial = ""
+        self.last_partial_time = 0.0
+        self.whisper = None
+        self.speech_buf = bytearray()
+        self.model_thread = threading.Thread(target=self._load_models, daemon=True)
+        self.model_thread.start()
 
         # Create task manager
         self.task_manager = task_system.TaskManager()
         
         self.running = True
+        
+        # File searches walk the disk, so they run off the listening loop
+        self.file_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="file-search")
+        
+        # Deletes whose search has finished, waiting for run() to ask for confirmation
+        # (only the voice thread prompts, so one confirmation is pending at a time)
+        self.pending_deletes = Queue()
+        
+        # Captured audio waiting for recognition (filled by the audio callback)
+        # A full ring drops its oldest block, so capture never waits on recognition
+        self.audio_ring = deque(maxlen=AUDIO_RING_SIZE)
+        self.audio_ready = threading.Event()
+        
+        # Start TTS worker (keeps speech off the listening loop)
+        self.speak_queue = Queue()
+        self.speaking = threading.Event()  # Set while an utterance is playing
+        self.tts_finished = threading.Event()  # Set when the queue drains; run() resets the recognizer
+        self.listening_shown = None  # Last listening state sent to the GUI
+        self.tts_thread = threading.Thread(target=self._tts_worker, daemon=True)
+        self.tts_thread.start()
+        
+        # Commands that need more than a SIMPLE_HANDLERS entry
+        self.handlers = {
+            "exit": self._handle_exit,
+            "volume": self._handle_volume,
+            "search": self._handle_search,
+            "delete": self._handle_delete,
+            "openfile": self._handle_openfile,
+            "addtask": self._handle_addtask,
+            "listtasks": self._handle_listtasks,
+            "listalltasks": self._handle_listalltasks,
+            "completetask": self._handle_completetask,
+            "deletetask": self._handle_deletetask,
+            "taskcount": self._handle_taskcount,
+        }
+    
+    def _load_models(self):
+        """Load the speech recognition model (runs in a background thread)"""
+        # faster-whisper needs VAD to know where each utterance ends
+        if WhisperModel is not None and self.vad is not None:
+            print("Loading faster-whisper model...")
+            try:
+                self.whisper = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8")
+                return  # Whisper decodes every utterance - no Vosk recognizer needed
+            except Exception as e:
+                print(f"Error loading faster-whisper, using Vosk: {e}")
+        
+        print("Loading Vosk model...")
+        try:
+            if RECOGNIZER_PROCESS:
+                rec = vosk_worker.RemoteRecognizer(VOSK_MODEL_PATH, SAMPLE_RATE)
+            else:
+                self.model = get_vosk_model()
+                rec = vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
+            rec.AcceptWaveform(WARMUP_SILENCE)
+            rec.Result()
+            rec.Reset()
+            self.rec = rec
+        except Exception as e:
+            print(f"Error loading Vosk model: {e}")
+            self.model = None
+    
+    def _set_listening(self, listening):
+        """Tell the GUI about a listening change (skipped if it already shows that state)"""
+        if listening != self.listening_shown:
+            self.listening_shown = listening
+            self.signals.set_listening.emit(listening)
     
     def speak(self, text):
-        """Speak text using Windows SAPI"""
-        self.signals.set_speaking.emit(True)
+        """Queue text to be spoken by the TTS worker"""
         self.signals.add_terminal_message.emit(f"> SYDNY: {text}")
-        
+        self.speak_queue.put(text)
+    
+    def _tts_worker(self):
+        """Speak queued text using one persistent Windows SAPI voice"""
         try:
-            escaped_text = text.replace("'", "''")
-            cmd = f'powershell -Command "Add-Type -AssemblyName System.Speech; $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; $speak.SelectVoiceByHints(\'Female\'); $speak.Rate = 0; $speak.Speak(\'{escaped_text}\')"'
-            subprocess.run(cmd, shell=True)
+            speaker = tts_system.create_speaker()
+            voice = tts_system.PromptCache(speaker, FIXED_PROMPTS)
         except Exception as e:
-            print(f"Error in TTS: {e}")
+            print(f"Error starting TTS: {e}")
+            speaker = voice = None
+        
+        # The GUI shows SPEAKING for a whole burst of queued utterances, not each one
+        shown_speaking = False
+        while True:
+            # Render the prompt files one at a time whenever nothing is waiting to be said
+            warming = voice is not None and voice.pending
+            try:
+                text = self.speak_queue.get(timeout=PROMPT_WARM_IDLE if warming else None)
+            except Empty:
+                voice.warm_next()
+                continue
+            if text is None:
+                self.speak_queue.task_done()
+                break
+            
+            self.speaking.set()
+            if not shown_speaking:
+                self.signals.set_speaking.emit(True)
+                shown_speaking = True
+            try:
+                if voice is not None:
+                    voice.speak(text)
+            except Exception as e:
+                print(f"Error in TTS: {e}")
+            self.speaking.clear()
+            if self.speak_queue.empty():
+                self.signals.set_speaking.emit(False)
+                shown_speaking = False
+                self.tts_finished.set()
+            self.speak_queue.task_done()
         
-        self.signals.set_speaking.emit(False)
+        if speaker is not None:
+            speaker.close()
+    
+    def _audio_callback(self, indata, frames, time_info, status):
+        """Push each microphone block into the ring buffer (runs on PortAudio's thread)"""
+        self.audio_ring.append(bytes(indata))
+        self.audio_ready.set()
+    
+    def _next_block(self, timeout):
+        """
+        Take the oldest captured block, waiting up to timeout seconds for one
+        Returns: Audio bytes, or None if nothing arrived
+        """
+        if not self.audio_ring:
+            self.audio_ready.clear()
+            # Re-check after clearing so a block appended in between isn't missed
+            if not self.audio_ring:
+                self.audio_ready.wait(timeout)
+        try:
+            return self.audio_ring.popleft()
+        except IndexError:
+            return None
+    
+    def _is_speech(self, data):
+        """Check whether any 20 ms frame of an audio chunk contains speech"""
+        for start in range(0, len(data) - VAD_FRAME_BYTES + 1, VAD_FRAME_BYTES):
+            if self.vad.is_speech(data[start:start + VAD_FRAME_BYTES], SAMPLE_RATE):
+                return True
+        return False
+    
+    def _recognize(self, data):
+        """
+        Feed one audio chunk to the recognizer, skipping silence when VAD is available
+        Returns: Recognized text when an utterance ends, otherwise None
+        """
+        if self.vad is not None:
+            if self._is_speech(data):
+                self.in_speech = True
+                self.silent_chunks = 0
+            elif not self.in_speech:
+                return None  # Room tone - nothing to decode
+            else:
+                self.silent_chunks += 1
+                if self.silent_chunks >= VAD_HANGOVER_CHUNKS:
+                    # Speech ended - finalize now instead of waiting for Vosk's endpointer
+                    self.in_speech = False
+                    return self._finish_utterance()
+        
+        if self.whisper is not None:
+            self.speech_buf += data
+            if len(self.speech_buf) >= WHISPER_MAX_BYTES:
+                return self._finish_utterance()
+            return None
+        
+        if self.rec.AcceptWaveform(data):
+            self.last_partial = ""
+            return self._result_text(self.rec.Result())
+        self._show_partial()
+        return None
+    
+    def _reset_recognizer(self):
+        """Discard any half-decoded utterance (runs on the voice thread, which owns the recognizer)"""
+        if self.rec is not None:
+            self.rec.Reset()
+        self.in_speech = False
+        self.silent_chunks = 0
+        self.speech_buf = bytearray()
+        self.last_partial = ""
+    
+    def _show_partial(self):
+        """Show Vosk's running hypothesis in the status line (rate-limited)"""
+        now = time.monotonic()
+        if now - self.last_partial_time < PARTIAL_INTERVAL:
+            return
+        
+        raw = self.rec.PartialResult()
+        if EMPTY_PARTIAL_TEXT in raw:
+            return
+        partial = json_loads(raw).get("partial", "").strip()
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            self.last_partial_time = now
+            self.signals.update_status.emit(partial[-PARTIAL_MAX_CHARS:])
+    
+    def _finish_utterance(self):
+        """Close the current utterance and return its text (or None)"""
+        if self.whisper is None:
+            self.last_partial = ""
+            return self._result_text(self.rec.FinalResult())
+        
+        audio = np.frombuffer(bytes(self.speech_buf), dtype=np.int16).astype(np.float32) / 32768.0
+        self.speech_buf = bytearray()
+        segments, _ = self.whisper.transcribe(audio, language="en", beam_size=1)
+        
+        # Match Vosk's output style (lowercase, no punctuation) so parse_command sees the same text
+        text = WHISPER_PUNCTUATION_RE.sub(" ", " ".join(seg.text for seg in segments))
+        return " ".join(text.lower().split()) or None
+    
+    @staticmethod
+    def _result_text(raw):
+        """Extract the text from a Vosk result, or None if it is empty or blank"""
+        # Most results after a pause are empty - skip those without parsing
+        if EMPTY_RESULT_TEXT in raw:
+            return None
+        text = json_loads(raw).get("text", "").strip()
+        return text or None
     
     def get_confirmation_gui(self, prompt):
         """Get confirmation from GUI buttons"""
         self.signals.show_confirmation.emit(prompt)
-        response = self.confirmation_queue.get()
+        response = self.wait_for_confirmation()
         self.signals.hide_confirmation.emit()
         return response
     
+    def _on_file_search(self, intent, target, future):
+        """Finish a search, delete or openfile command once its search is done (runs on the file pool)"""
+        if future.cancelled():
+            return  # Shutting down
+        
+        if intent == "search":
+            try:
+                matches = future.result()
+                if matches:
+                    self.speak(f"Found {len(matches)} files")
+                    # One print and one signal for the whole list
+                    listing = "\n".join(f"  - {match}" for match in matches)
+                    print(listing)
+                    self.signals.add_terminal_message.emit(listing)
+                else:
+                    self.speak(f"No files found matching {target}")
+            except Exception as e:
+                self.speak("Error searching for file")
+                print(f"Search error: {e}")
+        
+        elif intent == "delete":
+            try:
+                matches = future.result()
+                if matches:
+                    self.pending_deletes.put((target, matches[0]))
+                else:
+                    self.speak(f"Could not find file {target}")
+            except Exception as e:
+                self.speak("Error deleting file")
+                print(f"Delete error: {e}")
+        
+        elif intent == "openfile":
+            try:
+                matches = future.result()
+                if matches:
+                    result = windows_system.open_file(matches[0])
+                    self.speak(result)
+                else:
+                    self.speak(f"Could not find file {target}")
+            except Exception as e:
+                self.speak("Error opening file")
+                print(f"Open file error: {e}")
+    
+    def _confirm_pending_deletes(self):
+        """Ask to confirm each delete whose search has finished (runs on the voice thread)"""
+        while True:
+            try:
+                target, path = self.pending_deletes.get_nowait()
+            except Empty:
+                return
+            
+            self._set_listening(False)
+            try:
+                if self.get_confirmation_gui(f"Delete {target}?"):
+                    result = windows_system.delete_file(path)
+                    self.speak(result)
+                else:
+                    self.speak("Delete cancelled")
+            except Exception as e:
+                self.speak("Error deleting file")
+                print(f"Delete error: {e}")
+            self._set_listening(True)
+    
+    def _dispatch(self, intent, spec, target):
+        """Run a SIMPLE_HANDLERS command: check target, confirm, call, speak the result"""
+        if spec.needs_target and not target:
+            self.speak(spec.missing_target)
+            return
+        
+        try:
+            if spec.confirm and not self.get_confirmation_gui(spec.confirm):
+                self.speak(spec.cancelled)
+                return
+            result = spec.fn(target) if spec.needs_target else spec.fn()
+            self.speak(result)
+        except Exception as e:
+            self.speak(spec.error.format(target=target))
+            print(f"{intent.capitalize()} error: {e}")
+    
+    def _handle_exit(self, target):
+        """Say goodbye, then stop the loop and close the GUI"""
+        self.speak("Goodbye")
+        self.speak_queue.join()  # Say goodbye before the window closes
+        self.running = False
+        self.signals.close_window.emit()
+    
+    def _handle_volume(self, target):
+        if target:
+            try:
+                level = int(target)
+                if 0 <= level <= 100:
+                    result = windows_system.set_volume(level)
+                    self.speak(result)
+                else:
+                    self.speak("Volume must be between 0 and 100")
+            except ValueError:
+                self.speak("Please specify a valid number for volume")
+        else:
+            self.speak("Please specify a volume level")
+    
+    def _start_file_search(self, intent, target, missing_target):
+        """Announce the search and run it on the file pool (_on_file_search finishes the command)"""
+        if not target:
+            self.speak(missing_target)
+            return
+        
+        self.speak("Searching")
+        future = self.file_pool.submit(windows_system.search_file, target)
+        future.add_done_callback(lambda f: self._on_file_search(intent, target, f))
+    
+    def _handle_search(self, target):
+        self._start_file_search("search", target, "What file would you like me to search for?")
+    
+    def _handle_delete(self, target):
+        self._start_file_search("delete", target, "What file would you like me to delete?")
+    
+    def _handle_openfile(self, target):
+        self._start_file_search("openfile", target, "What file would you like me to open?")
+    
+    def _handle_addtask(self, target):
+        if target:
+            try:
+                parts = target.split("|")
+                description = parts[0]
+                priority = parts[1] if len(parts) > 1 else "normal"
+                result = self.task_manager.add_task(description, priority)
+                self.speak(result)
+            except Exception as e:
+                self.speak("Error adding task")
+                print(f"Add task error: {e}")
+        else:
+            self.speak("What task would you like to add?")
+    
+    def _speak_tasks(self, show_completed):
+        """Read out the task list (active only, or everything)"""
+        try:
+            tasks = self.task_manager.list_tasks(show_completed=show_completed)
+            if tasks:
+                count = len(tasks)
+                if show_completed:
+                    self.speak(f"You have {count} total tasks")
+                else:
+                    self.speak(f"You have {count} tasks")
+                listing = "\n".join(tasks)
+                print(listing)
+                self.signals.add_terminal_message.emit(listing)
+                for task in tasks:
+                    self.speak(task)
+            else:
+                self.speak("You have no tasks")
+        except Exception as e:
+            self.speak("Error listing tasks")
+            print(f"List tasks error: {e}")
+    
+    def _handle_listtasks(self, target):
+        self._speak_tasks(show_completed=False)
+    
+    def _handle_listalltasks(self, target):
+        self._speak_tasks(show_completed=True)
+    
+    def _handle_completetask(self, target):
+        if target:
+            try:
+                task_id = int(target)
+                result = self.task_manager.complete_task(task_id)
+                self.speak(result)
+            except ValueError:
+                self.speak("Please specify a valid task number")
+            except Exception as e:
+                self.speak("Error completing task")
+                print(f"Complete task error: {e}")
+        else:
+            self.speak("Which task number would you like to complete?")
+    
+    def _handle_deletetask(self, target):
+        if target:
+            try:
+                task_id = int(target)
+                if self.get_confirmation_gui(f"Confirm delete task {task_id}?"):
+                    result = self.task_manager.delete_task(task_id)
+                    self.speak(result)
+                else:
+                    self.speak("Delete cancelled")
+            except ValueError:
+                self.speak("Please specify a valid task number")
+            except Exception as e:
+                self.speak("Error deleting task")
+                print(f"Delete task error: {e}")
+        else:
+            self.speak("Which task number would you like to delete?")
+    
+    def _handle_taskcount(self, target):
+        try:
+            active = self.task_manager.get_task_count()
+            total = self.task_manager.get_task_count(include_completed=True)
+            self.speak(f"You have {active} active tasks and {total} total tasks")
+        except Exception as e:
+            self.speak("Error counting tasks")
+            print(f"Task count error: {e}")
+    
     def parse_command(self, text):
         """
         Parse natural language command into intent and target
         Returns: (intent, target) or (None, None) if no command found
         """
-        try:
-            filler_words = [
-                "please", "could", "you", "can", "would", "will",
-                "up", "the", "a", "an", "for", "me", "my"
-            ]
-            
-            words = text.lower().split()
-            cleaned_words = [w for w in words if w not in filler_words]
-            
-            # Check for "open file" command FIRST (before general "open")
-            if "file" in cleaned_words and "open" in cleaned_words:
-                cleaned_words = [w for w in cleaned_words if w not in ["open", "file"]]
-                if cleaned_words:
-                    target = " ".join(cleaned_words)
-                    return ("openfile", target)
-            
-            # Check for "open" command (for apps)
-            if "open" in cleaned_words:
-                cleaned_words.remove("open")
-                if cleaned_words:
-                    target = " ".join(cleaned_words)
-                    return ("open", target)
-            
-            # Check for "close" command
-            if "close" in cleaned_words:
-                cleaned_words.remove("close")
-                if cleaned_words:
-                    target = " ".join(cleaned_words)
-                    return ("close", target)
-            
-            # Check for "search" or "find" command
-            if "search" in cleaned_words or "find" in cleaned_words:
-                cleaned_words = [w for w in cleaned_words if w not in ["search", "find", "file"]]
-                if cleaned_words:
-                    target = " ".join(cleaned_words)
-                    return ("search", target)
-            
-            # Check for "delete" command
-            if "delete" in cleaned_words:
-                cleaned_words = [w for w in cleaned_words if w not in ["delete", "file"]]
-                if cleaned_words:
-                    target = " ".join(cleaned_words)
-                    return ("delete", target)
-            
-            # Check for "volume" commands
-            if "volume" in cleaned_words:
-                cleaned_words.remove("volume")
-                for word in cleaned_words:
-                    if word.isdigit():
-                        return ("volume", word)
-                return ("volume", None)
-            
-            if "mute" in cleaned_words:
-                return ("mute", None)
-            
-            if "unmute" in cleaned_words:
-                return ("unmute", None)
-            
-            # Check for power commands
-            if "shutdown" in cleaned_words or "shut" in cleaned_words:
-                return ("shutdown", None)
-            
-            if "restart" in cleaned_words:
-                return ("restart", None)
-            
-            if "sleep" in cleaned_words:
-                return ("sleep", None)
-            
-            # Check for task commands
-            if "task" in cleaned_words or "tasks" in cleaned_words:
-                # ADD TASK
-                if "add" in cleaned_words or "create" in cleaned_words or "new" in cleaned_words:
-                    remove_words = ["add", "create", "new", "task", "tasks"]
-                    task_words = [w for w in cleaned_words if w not in remove_words]
-                    
-                    # Check for priority
-                    priority = "normal"
-                    if "high" in task_words or "important" in task_words or "urgent" in task_words:
-                        priority = "high"
-                        task_words = [w for w in task_words if w not in ["high", "important", "urgent", "priority"]]
-                    elif "low" in task_words:
-                        priority = "low"
-                        task_words = [w for w in task_words if w not in ["low", "priority"]]
-                    
-                    if task_words:
-                        description = " ".join(task_words)
-                        return ("addtask", f"{description}|{priority}")
-                    else:
-                        return ("addtask", None)
-                
-                # LIST TASKS
-                if "list" in cleaned_words or "show" in cleaned_words or "what" in cleaned_words:
-                    if "all" in cleaned_words or "completed" in cleaned_words:
-                        return ("listalltasks", None)
-                    else:
-                        return ("listtasks", None)
-                
-                # COMPLETE TASK
-                if "complete" in cleaned_words or "finish" in cleaned_words or "done" in cleaned_words:
-                    for word in cleaned_words:
-                        if word.isdigit():
-                            return ("completetask", word)
-                    return ("completetask", None)
-                
-                # DELETE TASK
-                if "delete" in cleaned_words or "remove" in cleaned_words or "cancel" in cleaned_words:
-                    for word in cleaned_words:
-                        if word.isdigit():
-                            return ("deletetask", word)
-                    return ("deletetask", None)
-            
-            # TASK COUNT
-            if ("how" in cleaned_words and "many" in cleaned_words) or "count" in cleaned_words:
-                if "task" in cleaned_words or "tasks" in cleaned_words:
-                    return ("taskcount", None)
-            
-            if "exit" in cleaned_words or "quit" in cleaned_words:
-                return ("exit", None)
-            
-            return (None, None)
-        
-        except Exception as e:
-            print(f"Error parsing command: {e}")
-            return (None, None)
+        return parse_text(text)
     
     def run(self):
         """Main voice loop with FULL command handling"""
         print("SYDNY starting...")
+        self.signals.update_status.emit("INITIALIZING")
+        self.model_thread.join()
+        if self.rec is None and self.whisper is None:
+            self.signals.close_window.emit()
+            return
+        
+        self.signals.update_status.emit("SYDNY")
+        
         self.speak("My name is Sydney, how's it going?")
         
         print("\nListening...")
-        self.signals.set_listening.emit(True)
+        self._set_listening(True)
+        self.stream.start()
         
+        error_streak = 0
         while self.running:
             try:
-                data = self.stream.read(4000, exception_on_overflow=False)
+                self._confirm_pending_deletes()
+                
+                data = self._next_block(timeout=0.5)
+                if data is None:
+                    continue
                 
-                if self.rec.AcceptWaveform(data):
-                    result = json.loads(self.rec.Result())
-                    text = result.get("text", "")
+                # Don't spend CPU decoding SYDNY's own voice
+                if self.speaking.is_set():
+                    continue
+                
+                # The microphone heard SYDNY talking - throw that audio away
+                if self.tts_finished.is_set():
+                    self.tts_finished.clear()
+                    self._reset_recognizer()
+                
+                text = self._recognize(data)
+                error_streak = 0
+                if text:
+                    print(f"You said: {text}")
+                    self.signals.add_terminal_message.emit(f"> You: {text}")
+                    self._set_listening(False)
                     
-                    if text:
-                        print(f"You said: {text}")
-                        self.signals.add_terminal_message.emit(f"> You: {text}")
-                        self.signals.set_listening.emit(False)
-                        
-                        # Parse the command using our smart parser
-                        intent, target = self.parse_command(text)
-                        
-                        # Handle exit command
-                        if intent == "exit":
-                            self.speak("Goodbye")
-                            self.running = False
-                            self.signals.close_window.emit()  # Close the GUI
-                            break
-                        
-                        # Handle volume commands
-                        elif intent == "volume":
-                            if target:
-                                try:
-                                    level = int(target)
-                                    if 0 <= level <= 100:
-                                        result = windows_system.set_volume(level)
-                                        self.speak(result)
-                                    else:
-                                        self.speak("Volume must be between 0 and 100")
-                                except ValueError:
-                                    self.speak("Please specify a valid number for volume")
-                            else:
-                                self.speak("Please specify a volume level")
-                        
-                        elif intent == "mute":
-                            try:
-                                result = windows_system.mute()
-                                self.speak(result)
-                            except Exception as e:
-                                self.speak("Error muting audio")
-                                print(f"Mute error: {e}")
-                        
-                        elif intent == "unmute":
-                            try:
-                                result = windows_system.unmute()
-                                self.speak(result)
-                            except Exception as e:
-                                self.speak("Error unmuting audio")
-                                print(f"Unmute error: {e}")
-                        
-                        # Handle power commands (with confirmation)
-                        elif intent == "shutdown":
-                            try:
-                                if self.get_confirmation_gui("Confirm shutdown?"):
-                                    result = windows_system.shutdown_system()
-                                    self.speak(result)
-                                else:
-                                    self.speak("Shutdown cancelled")
-                            except Exception as e:
-                                self.speak("Error with shutdown command")
-                                print(f"Shutdown error: {e}")
-                        
-                        elif intent == "restart":
-                            try:
-                                if self.get_confirmation_gui("Confirm restart?"):
-                                    result = windows_system.restart_system()
-                                    self.speak(result)
-                                else:
-                                    self.speak("Restart cancelled")
-                            except Exception as e:
-                                self.speak("Error with restart command")
-                                print(f"Restart error: {e}")
-                        
-                        elif intent == "sleep":
-                            try:
-                                if self.get_confirmation_gui("Confirm sleep?"):
-                                    result = windows_system.sleep_system()
-                                    self.speak(result)
-                                else:
-                                    self.speak("Sleep cancelled")
-                            except Exception as e:
-                                self.speak("Error with sleep command")
-                                print(f"Sleep error: {e}")
-                        
-                        # Handle app commands
-                        elif intent == "open":
-                            if target:
-                                try:
-                                    result = windows_system.open_app(target)
-                                    self.speak(result)
-                                except Exception as e:
-                                    self.speak(f"Error opening {target}")
-                                    print(f"Open app error: {e}")
-                            else:
-                                self.speak("What would you like me to open?")
-                        
-                        elif intent == "close":
-                            if target:
-                                try:
-                                    result = windows_system.close_app(target)
-                                    self.speak(result)
-                                except Exception as e:
-                                    self.speak(f"Error closing {target}")
-                                    print(f"Close app error: {e}")
-                            else:
-                                self.speak("What would you like me to close?")
-                        
-                        # Handle file operations
-                        elif intent == "search":
-                            if target:
-                                try:
-                                    matches = windows_system.search_file(target)
-                                    if matches:
-                                        self.speak(f"Found {len(matches)} files")
-                                        for match in matches:
-                                            print(f"  - {match}")
-                                            self.signals.add_terminal_message.emit(f"  - {match}")
-                                    else:
-                                        self.speak(f"No files found matching {target}")
-                                except Exception as e:
-                                    self.speak("Error searching for file")
-                                    print(f"Search error: {e}")
-                            else:
-                                self.speak("What file would you like me to search for?")
-                        
-                        elif intent == "delete":
-                            if target:
-                                try:
-                                    matches = windows_system.search_file(target)
-                                    if matches:
-                                        if self.get_confirmation_gui(f"Delete {target}?"):
-                                            result = windows_system.delete_file(matches[0])
-                                            self.speak(result)
-                                        else:
-                                            self.speak("Delete cancelled")
-                                    else:
-                                        self.speak(f"Could not find file {target}")
-                                except Exception as e:
-                                    self.speak("Error deleting file")
-                                    print(f"Delete error: {e}")
-                            else:
-                                self.speak("What file would you like me to delete?")
-                        
-                        elif intent == "openfile":
-                            if target:
-                                try:
-                                    matches = windows_system.search_file(target)
-                                    if matches:
-                                        result = windows_system.open_file(matches[0])
-                                        self.speak(result)
-                                    else:
-                                        self.speak(f"Could not find file {target}")
-                                except Exception as e:
-                                    self.speak("Error opening file")
-                                    print(f"Open file error: {e}")
-                            else:
-                                self.speak("What file would you like me to open?")
-
-                        # Handle task commands
-                        elif intent == "addtask":
-                            if target:
-                                try:
-                                    parts = target.split("|")
-                                    description = parts[0]
-                                    priority = parts[1] if len(parts) > 1 else "normal"
-                                    result = self.task_manager.add_task(description, priority)
-                                    self.speak(result)
-                                except Exception as e:
-                                    self.speak("Error adding task")
-                                    print(f"Add task error: {e}")
-                            else:
-                                self.speak("What task would you like to add?")
-                        
-                        elif intent == "listtasks":
-                            try:
-                                tasks = self.task_manager.list_tasks()
-                                if tasks:
-                                    count = len(tasks)
-                                    self.speak(f"You have {count} tasks")
-                                    for task in tasks:
-                                        print(task)
-                                        self.signals.add_terminal_message.emit(task)
-                                        self.speak(task)
-                                else:
-                                    self.speak("You have no tasks")
-                            except Exception as e:
-                                self.speak("Error listing tasks")
-                                print(f"List tasks error: {e}")
-                        
-                        elif intent == "listalltasks":
-                            try:
-                                tasks = self.task_manager.list_tasks(show_completed=True)
-                                if tasks:
-                                    count = len(tasks)
-                                    self.speak(f"You have {count} total tasks")
-                                    for task in tasks:
-                                        print(task)
-                                        self.signals.add_terminal_message.emit(task)
-                                        self.speak(task)
-                                else:
-                                    self.speak("You have no tasks")
-                            except Exception as e:
-                                self.speak("Error listing tasks")
-                                print(f"List all tasks error: {e}")
-                        
-                        elif intent == "completetask":
-                            if target:
-                                try:
-                                    task_id = int(target)
-                                    result = self.task_manager.complete_task(task_id)
-                                    self.speak(result)
-                                except ValueError:
-                                    self.speak("Please specify a valid task number")
-                                except Exception as e:
-                                    self.speak("Error completing task")
-                                    print(f"Complete task error: {e}")
-                            else:
-                                self.speak("Which task number would you like to complete?")
-                        
-                        elif intent == "deletetask":
-                            if target:
-                                try:
-                                    task_id = int(target)
-                                    if self.get_confirmation_gui(f"Confirm delete task {task_id}?"):
-                                        result = self.task_manager.delete_task(task_id)
-                                        self.speak(result)
-                                    else:
-                                        self.speak("Delete cancelled")
-                                except ValueError:
-                                    self.speak("Please specify a valid task number")
-                                except Exception as e:
-                                    self.speak("Error deleting task")
-                                    print(f"Delete task error: {e}")
-                            else:
-                                self.speak("Which task number would you like to delete?")
-                        
-                        elif intent == "taskcount":
-                            try:
-                                active = self.task_manager.get_task_count()
-                                total = self.task_manager.get_task_count(include_completed=True)
-                                self.speak(f"You have {active} active tasks and {total} total tasks")
-                            except Exception as e:
-                                self.speak("Error counting tasks")
-                                print(f"Task count error: {e}")
-                        
-                        # Handle unknown commands
-                        elif intent is None:
-                            self.speak(f"You said {text}, sir")
-                        
-                        print("\nListening...")
-                        self.signals.set_listening.emit(True)
-            
+                    # Parse the command using our smart parser
+                    intent, target = self.parse_command(text)
+                    
+                    # One lookup per command: table-driven first, then the special cases
+                    if intent is None:
+                        self.speak(f"You said {text}, sir")
+                    elif intent in SIMPLE_HANDLERS:
+                        self._dispatch(intent, SIMPLE_HANDLERS[intent], target)
+                    else:
+                        self.handlers[intent](target)
+                    
+                    if not self.running:
+                        break  # exit command
+                    
+                    print("\nListening...")
+                    self._set_listening(True)
+        
             except KeyboardInterrupt:
                 print("\nStopping...")
                 self.speak("Shutting down")
                 break
-            except Exception as e:
+            except (OSError, ValueError, RuntimeError) as e:
+                # Audio, recognizer or result-decoding trouble - usually transient
                 print(f"Error in main loop: {e}")
-                continue
+                error_streak += 1
+            except Exception:
+                # Anything else is a bug - show where it came from
+                traceback.print_exc()
+                error_streak += 1
+            
+            if error_streak:
+                if error_streak >= MAX_ERROR_STREAK:
+                    print(f"Stopping after {error_streak} errors in a row")
+                    self.signals.update_status.emit("ERROR")
+                    break
+                time.sleep(ERROR_BACKOFF)
         
         # Cleanup
+        self.running = False
+        self.file_pool.shutdown(wait=False, cancel_futures=True)
+        self.task_manager.flush()
+        self.speak_queue.put(None)
+        self.tts_thread.join(timeout=10)
+        
+        if isinstance(self.rec, vosk_worker.RemoteRecognizer):
+            self.rec.close()
+        
         try:
-            self.stream.stop_stream()
+            self.stream.stop()
             self.stream.close()
-            self.mic.terminate()
             print("Audio resources cleaned up")
         except Exception as e:
             print(f"Error during cleanup: {e}")
@@ -798,12 +1342,16 @@ def main():
     window.show()
     
     # Create voice system
-    voice_system = VoiceSystem(window.signals, window.confirmation_response)
+    voice_system = VoiceSystem(window.signals, window.wait_for_confirmation)
     
     # Start voice system in separate thread
     voice_thread = threading.Thread(target=voice_system.run, daemon=True)
     voice_thread.start()
     
+    # Closing the window ends the process without waiting for the voice thread,
+    # so write any task change still waiting on the save timer
+    app.aboutToQuit.connect(voice_system.task_manager.flush)
+    
     # Run GUI
     sys.exit(app.exec_())
 
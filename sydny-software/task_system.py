@@ -5,25 +5,52 @@ Handles creation, storage, and management of user tasks
 
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 
+# Optional: faster JSON for the task file (falls back to the json module)
+try:
+    import orjson
+    json_loads = orjson.loads
+    
+    def json_dumps(data):
+        """Serialize data to compact UTF-8 JSON bytes"""
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(data):
+        """Serialize data to compact UTF-8 JSON bytes"""
+        return (json.dumps(data, separators=(',', ':')) + "\n").encode("utf-8")
+
 # Task data file location
 TASK_FILE = Path(__file__).parent / "sydny_tasks.json"
 
+# Seconds to wait after a change before writing, so bursts of edits share one write
+SAVE_DELAY = 0.5
+
+# Accepted task priorities
+PRIORITIES = frozenset({"low", "normal", "high"})
+
 class TaskManager:
     """Manages tasks with JSON persistence"""
     
     def __init__(self):
         self.tasks = []
+        self._by_id = {}  # Task id -> task dict (same objects as in self.tasks)
+        self._next_id = 1
+        self._dirty = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
         self.load_tasks()
     
     def load_tasks(self):
         """Load tasks from JSON file"""
         try:
-            if TASK_FILE.exists():
-                with open(TASK_FILE, 'r') as f:
-                    data = json.load(f)
+            if os.access(TASK_FILE, os.F_OK):
+                with open(TASK_FILE, 'rb') as f:
+                    data = json_loads(f.read())
                     self.tasks = data.get('tasks', [])
                     print(f"Loaded {len(self.tasks)} tasks from {TASK_FILE}")
             else:
@@ -32,20 +59,45 @@ class TaskManager:
         except Exception as e:
             print(f"Error loading tasks: {e}")
             self.tasks = []
+        
+        # Ids are stable, so new tasks continue after the highest one in use
+        self._by_id = {t['id']: t for t in self.tasks}
+        self._next_id = max(self._by_id, default=0) + 1
     
     def save_tasks(self):
-        """Save tasks to JSON file"""
-        try:
-            data = {
-                'tasks': self.tasks,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(TASK_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
-            return True
-        except Exception as e:
-            print(f"Error saving tasks: {e}")
-            return False
+        """Save tasks to JSON file now (atomic: written to a temp file, then swapped in)"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._dirty = False
+            try:
+                data = {
+                    'tasks': self.tasks,
+                    'last_updated': datetime.now().isoformat()
+                }
+                tmp_file = TASK_FILE.with_suffix('.tmp')
+                with open(tmp_file, 'wb') as f:
+                    f.write(json_dumps(data))
+                os.replace(tmp_file, TASK_FILE)
+                return True
+            except Exception as e:
+                print(f"Error saving tasks: {e}")
+                return False
+    
+    def _mark_dirty(self):
+        """Schedule a save SAVE_DELAY seconds from the first unsaved change"""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.save_tasks)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        """Write any pending changes immediately (call before exiting)"""
+        if self._dirty:
+            self.save_tasks()
         
     def add_task(self, description, priority="normal"):
         """
@@ -60,12 +112,12 @@ class TaskManager:
             if not description or not isinstance(description, str):
                 return "Invalid task description"
             
-            if priority not in ["low", "normal", "high"]:
+            if priority not in PRIORITIES:
                 priority = "normal"
             
             # Create task object
             task = {
-                'id': len(self.tasks) + 1,
+                'id': self._next_id,
                 'description': description.strip(),
                 'priority': priority,
                 'completed': False,
@@ -74,7 +126,9 @@ class TaskManager:
             }
             
             self.tasks.append(task)
-            self.save_tasks()
+            self._by_id[task['id']] = task
+            self._next_id += 1
+            self._mark_dirty()
             
             return f"Added task: {description}"
         
@@ -129,12 +183,7 @@ class TaskManager:
         Returns: Success message
         """
         try:
-            # Find task by ID
-            task = None
-            for t in self.tasks:
-                if t['id'] == task_id:
-                    task = t
-                    break
+            task = self._by_id.get(task_id)
             
             if not task:
                 return f"Task {task_id} not found"
@@ -145,7 +194,7 @@ class TaskManager:
             # Mark as completed
             task['completed'] = True
             task['completed_at'] = datetime.now().isoformat()
-            self.save_tasks()
+            self._mark_dirty()
             
             return f"Completed task: {task['description']}"
         
@@ -161,24 +210,15 @@ class TaskManager:
         Returns: Success message
         """
         try:
-            # Find task by ID
-            task = None
-            for t in self.tasks:
-                if t['id'] == task_id:
-                    task = t
-                    break
+            task = self._by_id.pop(task_id, None)
             
             if not task:
                 return f"Task {task_id} not found"
             
+            # Other tasks keep their ids
             description = task['description']
             self.tasks.remove(task)
-            
-            # Renumber remaining tasks
-            for idx, t in enumerate(self.tasks, 1):
-                t['id'] = idx
-            
-            self.save_tasks()
+            self._mark_dirty()
             
             return f"Deleted task: {description}"
         
@@ -197,7 +237,7 @@ class TaskManager:
             if include_completed:
                 return len(self.tasks)
             else:
-                return len([t for t in self.tasks if not t['completed']])
+                return sum(1 for t in self.tasks if not t['completed'])
         except Exception as e:
             print(f"Error getting task count: {e}")
             return 0
@@ -266,6 +306,7 @@ if __name__ == '__main__':
         print(task)
     
     print(f"\nTask count: {tm.get_task_count()} active, {tm.get_task_count(True)} total")
+    tm.flush()
 
 
 
@@ -0,0 +1,270 @@
+"""
+Text-to-Speech Module for SYDNY
+Keeps a single Windows speech engine alive for the whole session
+"""
+
+import hashlib
+import os
+import subprocess
+import winsound
+from pathlib import Path
+
+# Optional: direct SAPI COM access (pywin32)
+try:
+    import pythoncom
+    import win32com.client
+except ImportError:
+    pythoncom = None
+
+# Optional: in-process SAPI5 voice (falls back to PowerShell when missing)
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+# SAPI SpeechVoiceSpeakFlags / SpeechStreamFileMode values
+SVSF_DEFAULT = 0
+SVSF_PURGE_BEFORE_SPEAK = 2
+SSFM_CREATE_FOR_WRITE = 3
+
+# PowerShell launch flags: no profile scripts, no prompts, no execution-policy lookup
+POWERSHELL_ARGS = ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command"]
+
+# Written by PowerShell after each utterance has finished playing
+TTS_END_MARKER = "::END::"
+
+# Python writes UTF-8; PowerShell would otherwise read stdin in the OEM code page
+PS_UTF8_INPUT = "[Console]::InputEncoding = [Text.Encoding]::UTF8; "
+
+# PowerShell loop: load System.Speech once, then speak every line read from stdin
+PS_TTS_SCRIPT = (
+    PS_UTF8_INPUT +
+    "Add-Type -AssemblyName System.Speech; "
+    "$speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; "
+    "$speak.SelectVoiceByHints('Female'); "
+    "$speak.Rate = 0; "
+    "while ($t = [Console]::In.ReadLine()) { "
+    "$speak.Speak($t); "
+    f"[Console]::Out.WriteLine('{TTS_END_MARKER}'); "
+    "[Console]::Out.Flush() "
+    "}"
+)
+
+# PowerShell one-shot: render stdin text to the WAV file named in {path}
+PS_SAVE_SCRIPT = (
+    PS_UTF8_INPUT +
+    "Add-Type -AssemblyName System.Speech; "
+    "$speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; "
+    "$speak.SelectVoiceByHints('Female'); "
+    "$speak.Rate = 0; "
+    "$speak.SetOutputToWaveFile('{path}'); "
+    "$speak.Speak([Console]::In.ReadToEnd()); "
+    "$speak.Dispose()"
+)
+
+# Pre-rendered prompts (one WAV per phrase)
+TTS_CACHE_DIR = Path(__file__).parent / "tts_cache"
+
+
+class PowerShellSpeaker:
+    """Long-lived PowerShell process driving Windows SAPI"""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            POWERSHELL_ARGS + [PS_TTS_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding="utf-8"
+        )
+
+    def speak(self, text):
+        """Speak one utterance and wait until it finishes"""
+        # One utterance per line - an empty line would end the PowerShell loop
+        line = " ".join(text.split())
+        if not line:
+            return
+        self.proc.stdin.write(line + "\n")
+        self.proc.stdin.flush()
+        
+        # Block until PowerShell reports the utterance is done (or exits)
+        for reply in self.proc.stdout:
+            if reply.strip() == TTS_END_MARKER:
+                break
+
+    def save(self, text, path):
+        """Render text to a WAV file (one-off process, only used to fill the cache)"""
+        script = PS_SAVE_SCRIPT.replace("{path}", str(path).replace("'", "''"))
+        subprocess.run(
+            POWERSHELL_ARGS + [script],
+            input=text,
+            encoding="utf-8",
+            check=True
+        )
+
+    def close(self):
+        """Let PowerShell finish speaking and exit"""
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=10)
+        except Exception as e:
+            print(f"Error closing TTS process: {e}")
+            self.proc.kill()
+
+
+class SapiSpeaker:
+    """One SAPI.SpVoice COM object reused for every utterance"""
+
+    def __init__(self):
+        # COM must be initialised on the thread that owns the voice
+        pythoncom.CoInitialize()
+        try:
+            self.sapi = self._create_voice()
+        except Exception:
+            # Undo CoInitialize so the fallback speaker starts on a clean thread
+            pythoncom.CoUninitialize()
+            raise
+
+    @staticmethod
+    def _create_voice():
+        """Create an SpVoice using the first female voice installed"""
+        sapi = win32com.client.Dispatch("SAPI.SpVoice")
+        voices = sapi.GetVoices()
+        for i in range(voices.Count):
+            voice = voices.Item(i)
+            description = voice.GetDescription().lower()
+            if 'zira' in description or voice.GetAttribute('Gender') == 'Female':
+                sapi.Voice = voice
+                break
+        return sapi
+
+    def speak(self, text):
+        """Speak text and wait until it finishes"""
+        self.sapi.Speak(text, SVSF_DEFAULT)
+
+    def save(self, text, path):
+        """Render text to a WAV file (separate voice, so live output is untouched)"""
+        stream = win32com.client.Dispatch("SAPI.SpFileStream")
+        stream.Open(str(path), SSFM_CREATE_FOR_WRITE)
+        try:
+            writer = self._create_voice()
+            writer.AudioOutputStream = stream
+            writer.Speak(text, SVSF_DEFAULT)
+        finally:
+            stream.Close()
+
+    def close(self):
+        """Stop any speech in progress and release COM"""
+        try:
+            self.sapi.Speak("", SVSF_PURGE_BEFORE_SPEAK)
+        except Exception as e:
+            print(f"Error stopping SAPI voice: {e}")
+        self.sapi = None
+        pythoncom.CoUninitialize()
+
+
+class Pyttsx3Speaker:
+    """In-process SAPI5 voice via pyttsx3 - no subprocess per utterance"""
+
+    def __init__(self):
+        self.engine = pyttsx3.init('sapi5')
+        for voice in self.engine.getProperty('voices'):
+            if 'zira' in voice.name.lower() or voice.gender == 'Female':
+                self.engine.setProperty('voice', voice.id)
+                break
+
+    def speak(self, text):
+        """Speak text and wait until it finishes"""
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def save(self, text, path):
+        """Render text to a WAV file"""
+        self.engine.save_to_file(text, str(path))
+        self.engine.runAndWait()
+
+    def close(self):
+        """Stop any speech in progress"""
+        self.engine.stop()
+
+
+def create_speaker():
+    """
+    Create the fastest available speaker
+    Must be called on the thread that will use it (SAPI is COM-based)
+    Returns: SapiSpeaker, then Pyttsx3Speaker, then PowerShellSpeaker as fallbacks
+    """
+    if pythoncom is not None:
+        try:
+            return SapiSpeaker()
+        except Exception as e:
+            print(f"Error starting SAPI voice, trying pyttsx3: {e}")
+    if pyttsx3 is not None:
+        try:
+            return Pyttsx3Speaker()
+        except Exception as e:
+            print(f"Error starting pyttsx3, using PowerShell instead: {e}")
+    return PowerShellSpeaker()
+
+
+class PromptCache:
+    """Plays fixed prompts from pre-rendered WAV files, everything else live"""
+
+    def __init__(self, speaker, prompts, cache_dir=TTS_CACHE_DIR):
+        self.speaker = speaker
+        self.prompts = frozenset(prompts)
+        self.cache_dir = cache_dir
+        self.pending = list(self.prompts)
+
+    def path_for(self, text):
+        """WAV file location for a prompt"""
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.wav"
+
+    def render(self, text):
+        """
+        Make sure a prompt has a WAV file
+        Rendered under a temporary name first, so an interrupted render is never mistaken for a cached one
+        Returns: Path to the WAV file, or None if rendering failed
+        """
+        path = self.path_for(text)
+        if os.access(path, os.F_OK):
+            return path
+        part = path.with_suffix(".part.wav")
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            self.speaker.save(text, part)
+            os.replace(part, path)
+            return path
+        except Exception as e:
+            print(f"Error caching prompt '{text}': {e}")
+            try:
+                os.unlink(part)
+            except OSError:
+                pass
+            return None
+
+    def warm_next(self):
+        """Render one prompt that is not cached yet (call while the voice is idle)"""
+        while self.pending:
+            text = self.pending.pop()
+            if not os.access(self.path_for(text), os.F_OK):
+                self.render(text)
+                break
+
+    def speak(self, text):
+        """Play a cached prompt, or speak live if the text has no WAV file (yet)"""
+        if text in self.prompts:
+            path = self.path_for(text)
+            if os.access(path, os.F_OK):
+                try:
+                    winsound.PlaySound(str(path), winsound.SND_FILENAME)
+                    return
+                except Exception as e:
+                    # Unplayable file - drop it so it gets rendered again
+                    print(f"Error playing cached prompt '{text}': {e}")
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                    self.pending.append(text)
+        self.speaker.speak(text)
@@ -0,0 +1,141 @@
+"""
+Vosk Worker Process for SYDNY
+Runs the Vosk model and recognizer in their own process, so decoding never
+competes with the GUI for the GIL
+
+The worker is this file run as a script (not a multiprocessing child), so it
+never re-imports sydny_integrated and its GUI/audio modules
+"""
+
+import pickle
+import subprocess
+import sys
+import threading
+
+import vosk
+
+# Seconds to wait for the worker to load the model
+READY_TIMEOUT = 120
+
+# Windows: don't open a console window for the worker
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def run(inp, out, model_path, sample_rate):
+    """
+    Worker loop: load the model once, then answer recognizer calls read from inp
+    Each request is (method name, args); each reply is (ok, result or error text)
+    """
+    def reply(message):
+        pickle.dump(message, out, pickle.HIGHEST_PROTOCOL)
+        out.flush()
+
+    try:
+        model = vosk.Model(model_path)
+        rec = vosk.KaldiRecognizer(model, sample_rate)
+    except Exception as e:
+        reply((False, str(e)))
+        return
+    reply((True, None))
+
+    while True:
+        try:
+            method, args = pickle.load(inp)
+        except EOFError:
+            break  # Parent went away
+
+        if method == "close":
+            break
+
+        try:
+            reply((True, getattr(rec, method)(*args)))
+        except Exception as e:
+            reply((False, str(e)))
+
+
+class RemoteRecognizer:
+    """KaldiRecognizer stand-in that forwards every call to a worker process"""
+
+    def __init__(self, model_path, sample_rate):
+        self.lock = threading.Lock()
+        self.proc = subprocess.Popen(
+            [sys.executable, __file__, model_path, str(sample_rate)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            creationflags=CREATE_NO_WINDOW
+        )
+
+        # Wait for the model to load (or fail) before handing out the recognizer
+        # (pipes can't be polled on Windows, so the first reply is read on a helper thread)
+        ready = []
+        reader = threading.Thread(target=lambda: ready.append(self._recv()), daemon=True)
+        reader.start()
+        reader.join(READY_TIMEOUT)
+        if not ready:
+            self.proc.kill()
+            raise RuntimeError("Vosk worker did not start in time")
+        ok, error = ready[0]
+        if not ok:
+            self.proc.wait()
+            raise RuntimeError(error)
+
+    def _send(self, message):
+        """Write one request to the worker"""
+        pickle.dump(message, self.proc.stdin, pickle.HIGHEST_PROTOCOL)
+        self.proc.stdin.flush()
+
+    def _recv(self):
+        """Read one reply from the worker ((False, reason) if it has exited)"""
+        try:
+            return pickle.load(self.proc.stdout)
+        except EOFError:
+            return (False, "worker exited")
+
+    def _call(self, method, *args):
+        """Run one recognizer method in the worker and return its result"""
+        with self.lock:
+            self._send((method, args))
+            ok, result = self._recv()
+        if not ok:
+            raise RuntimeError(f"Vosk worker {method} failed: {result}")
+        return result
+
+    def AcceptWaveform(self, data):
+        """Feed audio; True when an utterance has ended"""
+        return self._call("AcceptWaveform", data)
+
+    def Result(self):
+        """JSON result of the utterance that just ended"""
+        return self._call("Result")
+
+    def PartialResult(self):
+        """JSON of the running hypothesis"""
+        return self._call("PartialResult")
+
+    def FinalResult(self):
+        """Close the current utterance and return its JSON result"""
+        return self._call("FinalResult")
+
+    def Reset(self):
+        """Discard the current utterance"""
+        return self._call("Reset")
+
+    def close(self):
+        """Stop the worker process"""
+        try:
+            with self.lock:
+                self._send(("close", ()))
+                self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception as e:
+            print(f"Error stopping Vosk worker: {e}")
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.stdout.close()
+
+
+if __name__ == "__main__":
+    # stdout carries the replies - keep stray prints off it
+    replies = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    run(sys.stdin.buffer, replies, sys.argv[1], int(sys.argv[2]))
@@ -4,13 +4,28 @@ Handles volume, power, and system controls for Windows
 """
 
 import subprocess
+import errno
 import os
+import re
 import shutil
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate
 from pathlib import Path
-from ctypes import cast, POINTER
+import ctypes
+from ctypes import cast, POINTER, wintypes
 from comtypes import CLSCTX_ALL
 from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
 
+# Optional: default-device notifications (older pycaw versions lack them)
+try:
+    from pycaw.callbacks import MMNotificationClient
+except ImportError:
+    MMNotificationClient = None
+
 # SAFETY MODE - Set to False to enable actual execution
 ANNOUNCE_ONLY = True
 print(f"DEBUG: windows_system loaded with ANNOUNCE_ONLY = {ANNOUNCE_ONLY}")
@@ -20,14 +35,47 @@ def set_announce_mode(enabled):
     global ANNOUNCE_ONLY
     ANNOUNCE_ONLY = enabled
 
+# Volume interface of the default speakers, activated once and reused
+_volume_iface = None
+_device_listener = None
+
+if MMNotificationClient is not None:
+    class _DefaultDeviceListener(MMNotificationClient):
+        """Drops the cached volume interface when the default output device changes"""
+
+        def on_default_device_changed(self, flow, flow_id, role, role_id, default_device_id):
+            _forget_volume_interface()
+
+def _forget_volume_interface():
+    """Drop the cached volume interface so the next call activates it again"""
+    global _volume_iface
+    _volume_iface = None
+
+def _watch_default_device():
+    """Register for default-device changes (once, best effort)"""
+    global _device_listener
+    if _device_listener is not None or MMNotificationClient is None:
+        return
+    try:
+        listener = _DefaultDeviceListener()
+        AudioUtilities.GetDeviceEnumerator().RegisterEndpointNotificationCallback(listener)
+        _device_listener = listener  # Keep a reference so the COM callback stays alive
+    except Exception as e:
+        print(f"Error watching audio devices: {e}")
+
 def get_volume_interface():
-    """Get the Windows audio volume interface"""
+    """Get the Windows audio volume interface (cached until the default device changes)"""
+    global _volume_iface
+    if _volume_iface is not None:
+        return _volume_iface
+    
     try:
         devices = AudioUtilities.GetSpeakers()
         interface = devices.Activate(
             IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
-        return volume
+        _volume_iface = cast(interface, POINTER(IAudioEndpointVolume))
+        _watch_default_device()
+        return _volume_iface
     except Exception as e:
         print(f"Error getting volume interface: {e}")
         return None
@@ -53,6 +101,7 @@ def set_volume(level):
         volume.SetMasterVolumeLevelScalar(scalar, None)
         return f"Volume set to {level}%"
     except Exception as e:
+        _forget_volume_interface()  # The endpoint may have gone away
         return f"Error setting volume: {e}"
 
 def get_volume():
@@ -65,6 +114,7 @@ def get_volume():
         current_volume = volume.GetMasterVolumeLevelScalar()
         return int(current_volume * 100)
     except Exception as e:
+        _forget_volume_interface()
         print(f"Error getting volume: {e}")
         return 0
 
@@ -81,6 +131,7 @@ def mute():
         volume.SetMute(1, None)
         return "Audio muted"
     except Exception as e:
+        _forget_volume_interface()
         return f"Error muting: {e}"
 
 def unmute():
@@ -96,6 +147,7 @@ def unmute():
         volume.SetMute(0, None)
         return "Audio unmuted"
     except Exception as e:
+        _forget_volume_interface()
         return f"Error unmuting: {e}"
     
 def shutdown_system():
@@ -155,6 +207,124 @@ def sleep_system():
 # APP CONTROL FUNCTIONS
 # ============================================================================
 
+# Win32 process enumeration/termination (replaces spawning taskkill.exe)
+TH32CS_SNAPPROCESS = 0x00000002
+PROCESS_TERMINATE = 0x0001
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+class PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("cntUsage", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("th32DefaultHeapID", ctypes.c_size_t),
+        ("th32ModuleID", wintypes.DWORD),
+        ("cntThreads", wintypes.DWORD),
+        ("th32ParentProcessID", wintypes.DWORD),
+        ("pcPriClassBase", wintypes.LONG),
+        ("dwFlags", wintypes.DWORD),
+        ("szExeFile", wintypes.WCHAR * 260),
+    ]
+
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+_kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+_kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+_kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, POINTER(PROCESSENTRY32W)]
+_kernel32.Process32FirstW.restype = wintypes.BOOL
+_kernel32.Process32NextW.argtypes = [wintypes.HANDLE, POINTER(PROCESSENTRY32W)]
+_kernel32.Process32NextW.restype = wintypes.BOOL
+_kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+_kernel32.OpenProcess.restype = wintypes.HANDLE
+_kernel32.TerminateProcess.argtypes = [wintypes.HANDLE, wintypes.UINT]
+_kernel32.TerminateProcess.restype = wintypes.BOOL
+_kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+_kernel32.CloseHandle.restype = wintypes.BOOL
+
+def _terminate_by_name(exe_name):
+    """
+    Terminate every process whose executable is exe_name (like taskkill /F /IM, without a child process)
+    Returns: (number found, number terminated)
+    """
+    snapshot = _kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot == INVALID_HANDLE_VALUE:
+        raise ctypes.WinError(ctypes.get_last_error())
+    
+    pids = []
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        more = _kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while more:
+            if entry.szExeFile.lower() == exe_name:
+                pids.append(entry.th32ProcessID)
+            more = _kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        _kernel32.CloseHandle(snapshot)
+    
+    terminated = 0
+    for pid in pids:
+        handle = _kernel32.OpenProcess(PROCESS_TERMINATE, False, pid)
+        if not handle:
+            continue  # Exited meanwhile, or not ours to kill
+        try:
+            if _kernel32.TerminateProcess(handle, 1):
+                terminated += 1
+        finally:
+            _kernel32.CloseHandle(handle)
+    return len(pids), terminated
+
+# Processes started by open_app, so close_app can end them without spawning taskkill
+_open_apps = {}  # App name -> list of Popen handles
+
+def _open_notepad():
+    """Start notepad and remember its handle"""
+    # No shell in between, and no console or inherited handles for a GUI app
+    proc = subprocess.Popen(
+        ["notepad.exe"],
+        close_fds=True,
+        creationflags=subprocess.DETACHED_PROCESS
+    )
+    _open_apps.setdefault("notepad", []).append(proc)
+    return f"Opening notepad"
+
+def _close_notepad():
+    """Close notepad, preferring the copies open_app started"""
+    # End the copies we started directly (no extra process)
+    running = [p for p in _open_apps.pop("notepad", []) if p.poll() is None]
+    if running:
+        for proc in running:
+            proc.terminate()
+        return f"Closed notepad"
+    
+    # Not started by us (or already handed off) - find notepad by name
+    found, terminated = _terminate_by_name("notepad.exe")
+    
+    if terminated:
+        return f"Closed notepad"
+    elif not found:
+        return "Notepad is not running"
+    else:
+        return f"Error closing notepad"
+
+# Spoken app names -> (open handler, close handler); for now, we only support notepad
+_APP_ALIASES = {
+    "notepad": (_open_notepad, _close_notepad),
+    "note pad": (_open_notepad, _close_notepad),
+    "notepad.exe": (_open_notepad, _close_notepad),
+}
+
+def _find_app(app_name):
+    """
+    Look up the handlers for a spoken app name
+    Returns: (open handler, close handler), or None if the app is unknown
+    """
+    name = " ".join(app_name.lower().split())
+    handlers = _APP_ALIASES.get(name)
+    if handlers is None:
+        # Longer phrases like "the notepad app" - look for a known name inside
+        handlers = next((h for alias, h in _APP_ALIASES.items() if alias in name), None)
+    return handlers
+
 def open_app(app_name):
     """
     Open an application by name
@@ -170,12 +340,10 @@ def open_app(app_name):
         if not app_name or not isinstance(app_name, str):
             return "Invalid app name"
         
-        # For now, we only support notepad
-        if "notepad" in app_name.lower():
-            subprocess.Popen("notepad.exe", shell=True)
-            return f"Opening notepad"
-        else:
+        handlers = _find_app(app_name)
+        if handlers is None:
             return f"I don't know how to open {app_name} yet"
+        return handlers[0]()
             
     except FileNotFoundError:
         return f"Could not find {app_name}"
@@ -197,25 +365,10 @@ def close_app(app_name):
         if not app_name or not isinstance(app_name, str):
             return "Invalid app name"
         
-        # For now, we only support notepad
-        if "notepad" in app_name.lower():
-            # Use taskkill to close notepad
-            result = subprocess.run(
-                ["taskkill", "/F", "/IM", "notepad.exe"],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                return f"Closed notepad"
-            else:
-                # Check if notepad wasn't running
-                if "not found" in result.stderr.lower():
-                    return "Notepad is not running"
-                else:
-                    return f"Error closing notepad"
-        else:
+        handlers = _find_app(app_name)
+        if handlers is None:
             return f"I don't know how to close {app_name} yet"
+        return handlers[1]()
             
     except Exception as e:
         return f"Error closing {app_name}: {e}"
@@ -224,63 +377,226 @@ def close_app(app_name):
 # FILE OPERATIONS
 # ============================================================================
 
+# The user's home directory (looked up once; it doesn't change while SYDNY runs)
+_USER_HOME = Path.home()
+
+# User folders searched before the home directory itself
+SEARCH_FOLDERS = ("Desktop", "Documents", "Downloads")
+
+# Search folders, found once per session (the home directory doesn't move while SYDNY runs)
+_search_paths_cache = None  # Tuple of Paths
+
+def _invalidate_search_paths():
+    """Forget the cached search folders so the next search looks them up again"""
+    global _search_paths_cache
+    _search_paths_cache = None
+
 def get_search_paths():
     """
     Get common user folders to search for files
     Returns: List of Path objects
     """
+    global _search_paths_cache
+    if _search_paths_cache is not None:
+        return list(_search_paths_cache)
+    
     try:
-        user_home = Path.home()
+        # One directory read instead of an exists() probe per folder
+        with os.scandir(_USER_HOME) as it:
+            entries = {entry.name: entry for entry in it}
         paths = [
-            user_home / "Desktop",
-            user_home / "Documents",
-            user_home / "Downloads",
-            user_home,  # Home directory itself
+            _USER_HOME / name
+            for name in SEARCH_FOLDERS
+            if name in entries and entries[name].is_dir()
         ]
-        # Only return paths that exist
-        return [p for p in paths if p.exists()]
+        paths.append(_USER_HOME)  # Home directory itself
+        _search_paths_cache = tuple(paths)
+        return paths
     except Exception as e:
         print(f"Error getting search paths: {e}")
         return []
 
+# Folders never searched inside (lowercase): app data, tooling and caches
+SKIP_DIRS = frozenset({
+    "appdata", "node_modules", "__pycache__", "venv", "$recycle.bin",
+})
+
+# How many folder levels below each search path are searched
+MAX_SEARCH_DEPTH = 3
+
+# Folders of one search level are listed in parallel so their I/O overlaps
+_scan_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dir-scan")
+
+# Directory listings reused between searches: path -> (mtime, files, subfolders)
+_dir_index = {}
+
+def _list_dir(directory):
+    """
+    List a directory, rescanning only when its mtime changes
+    (adding, removing or renaming an entry updates the directory's mtime)
+    Returns: (files, subfolders) - files as (case-folded name, full path) tuples,
+             subfolders as paths, with dot-folders and SKIP_DIRS left out
+    """
+    key = os.fspath(directory)
+    # The only per-call metadata query: one stat of the folder itself
+    mtime = os.stat(key).st_mtime
+    cached = _dir_index.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    
+    # On Windows scandir is FindFirstFileExW/FindNextFileW, which return each entry's
+    # attributes in the same batched call, so DirEntry.is_file() needs no stat per file
+    # Dot-files are listed (the glob this replaced matched them too);
+    # dot-folders (.git, .cache, ...) are not descended into
+    files = []
+    subdirs = []
+    with os.scandir(key) as it:
+        for entry in it:
+            # Links are not followed, so a folder can't lead back into itself
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith(".") and entry.name.lower() not in SKIP_DIRS:
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                files.append((entry.name.casefold(), entry.path))
+    _dir_index[key] = (mtime, files, subdirs)
+    return files, subdirs
+
+# Most files search_file returns
+MAX_MATCHES = 5
+
+# Characters that make a search term a wildcard pattern
+WILDCARD_CHARS = frozenset("*?[")
+
+# Recent search results: casefolded term -> (time stored, matches), oldest first
+# Repeated queries ("open my resume" ... "delete my resume") skip the scan
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+SEARCH_CACHE_TTL = 5.0
+SEARCH_CACHE_SIZE = 32
+
+def _scan(directory, is_search_path):
+    """
+    List one folder for search_file (runs on the scan pool)
+    Returns: (files, subfolders), or None if the folder can't be read
+    """
+    try:
+        return _list_dir(directory)
+    except PermissionError:
+        # Skip directories we don't have permission to access
+        return None
+    except FileNotFoundError:
+        if is_search_path:
+            # Folder removed since the search paths were cached
+            _invalidate_search_paths()
+        return None
+    except Exception as e:
+        print(f"Error searching in {directory}: {e}")
+        return None
+
+def _name_matcher(filename):
+    """
+    Build the test applied to each case-folded file name
+    Plain terms are a substring check; wildcard terms are compiled once for every folder
+    """
+    # Names in the index are case-folded once per listing, so only the term is folded here
+    needle = filename.casefold()
+    if WILDCARD_CHARS.isdisjoint(needle):
+        return lambda name: needle in name
+    # Same meaning as the original glob("*{filename}*")
+    return re.compile(translate(f"*{needle}*")).match
+
 def search_file(filename):
     """
-    Search for a file in common locations
+    Search for a file in common locations and their subfolders (up to MAX_SEARCH_DEPTH deep)
     Args:
         filename: Name of file to search for (can be partial)
     Returns: List of matching file paths (up to 5 matches)
     """
+    # Validate input
+    if not filename or not isinstance(filename, str):
+        return []
+    
+    # Already a path - one stat instead of scanning every search folder
+    if os.sep in filename or (os.altsep and os.altsep in filename):
+        try:
+            return [filename] if _is_regular_file(filename) else []
+        except OSError:
+            return []
+    
+    key = filename.casefold()
+    now = time.monotonic()
+    with _search_cache_lock:
+        cached = _search_cache.get(key)
+        if cached is not None and now - cached[0] < SEARCH_CACHE_TTL:
+            _search_cache.move_to_end(key)
+            return list(cached[1])
+    
+    matches = _walk_search_paths(filename)
+    
+    with _search_cache_lock:
+        _search_cache[key] = (now, tuple(matches))
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return matches
+
+def _clear_search_cache():
+    """Forget cached search results (after a file was moved or deleted)"""
+    with _search_cache_lock:
+        _search_cache.clear()
+
+def _walk_search_paths(filename):
+    """
+    Scan the search paths for files whose name matches filename
+    Returns: List of matching file paths (up to MAX_MATCHES)
+    """
     matches = []
+    is_match = _name_matcher(filename)
     
     try:
-        # Validate input
-        if not filename or not isinstance(filename, str):
-            return matches
+        # Breadth-first, one level at a time, so shallow matches in any search path
+        # come before deep ones; the folders of a level are listed in parallel
+        level = get_search_paths()
+        visited = set()
         
-        search_paths = get_search_paths()
-        
-        for search_path in search_paths:
-            try:
-                # Search in the directory (not recursive for now, to keep it simple)
-                for item in search_path.glob(f"*{filename}*"):
-                    if item.is_file():
-                        matches.append(str(item))
-                        
-                # Limit to first 5 matches to avoid overwhelming results
-                if len(matches) >= 5:
-                    break
-            except PermissionError:
-                # Skip directories we don't have permission to access
-                continue
-            except Exception as e:
-                print(f"Error searching in {search_path}: {e}")
-                continue
+        for depth in range(MAX_SEARCH_DEPTH + 1):
+            folders = []
+            for directory in level:
+                key = os.path.normcase(os.fspath(directory))
+                if key not in visited:  # e.g. Desktop, reached again from the home directory
+                    visited.add(key)
+                    folders.append(directory)
+            if not folders:
+                break
+            
+            # map() keeps folder order, so results don't depend on which scan finishes first
+            listings = _scan_pool.map(_scan, folders, [depth == 0] * len(folders))
+            
+            level = []
+            for listing in listings:
+                if listing is None:
+                    continue
+                files, subdirs = listing
+                for name, path in files:
+                    if is_match(name):
+                        matches.append(path)
+                        # Limit to first 5 matches to avoid overwhelming results
+                        if len(matches) >= MAX_MATCHES:
+                            return matches
+                level.extend(subdirs)
                 
     except Exception as e:
         print(f"Error searching for {filename}: {e}")
     
     return matches
 
+def _is_regular_file(path):
+    """
+    Check that path is a regular file with a single stat call
+    Raises: FileNotFoundError / PermissionError like os.stat (callers already handle them)
+    """
+    return stat.S_ISREG(os.stat(path).st_mode)
+
 def open_file(filepath):
     """
     Open a file with its default application
@@ -288,19 +604,18 @@ def open_file(filepath):
         filepath: Full path to the file
     Returns: Success message or error description
     """
+    name = os.path.basename(filepath)
     if ANNOUNCE_ONLY:
-        return f"Would open {Path(filepath).name}"
+        return f"Would open {name}"
     
     try:
-        # Validate file exists
-        if not os.path.exists(filepath):
-            return f"File not found: {filepath}"
-        
-        if not os.path.isfile(filepath):
+        # os.startfile would open a folder in Explorer - one stat checks both
+        # that the path exists (FileNotFoundError otherwise) and that it is a file
+        if not _is_regular_file(filepath):
             return f"Not a file: {filepath}"
         
         os.startfile(filepath)
-        return f"Opening {Path(filepath).name}"
+        return f"Opening {name}"
     except FileNotFoundError:
         return f"File not found: {filepath}"
     except PermissionError:
@@ -316,21 +631,36 @@ def move_file(source, destination):
         destination: Destination directory or file path
     Returns: Success message or error description
     """
+    name = os.path.basename(source)
     if ANNOUNCE_ONLY:
-        return f"Would move {Path(source).name} to {destination}"
+        return f"Would move {name} to {destination}"
     
     try:
-        # Validate source exists
-        if not os.path.exists(source):
-            return f"Source file not found: {source}"
-        
-        if not os.path.isfile(source):
+        # A rename would move a whole folder - one stat checks both
+        # that the source exists (FileNotFoundError otherwise) and that it is a file
+        if not _is_regular_file(source):
             return f"Source is not a file: {source}"
         
-        shutil.move(source, destination)
-        return f"Moved {Path(source).name} to {destination}"
+        target = destination
+        if os.path.isdir(target):
+            target = os.path.join(target, name)
+        
+        # os.rename refuses to overwrite on Windows but silently replaces on POSIX
+        if os.path.exists(target):
+            return f"Error moving file: {target} already exists"
+        
+        # Same volume: a single rename; only copy across drives
+        try:
+            os.rename(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # The original destination, so shutil.move still refuses to overwrite a file in a folder
+            shutil.move(source, destination)
+        _clear_search_cache()
+        return f"Moved {name} to {destination}"
     except FileNotFoundError:
-        return f"File not found: {source}"
+        return f"Source file not found: {source}"
     except PermissionError:
         return f"Permission denied"
     except Exception as e:
@@ -343,22 +673,21 @@ def delete_file(filepath):
         filepath: Path to file to delete
     Returns: Success message or error description
     """
+    name = os.path.basename(filepath)
     if ANNOUNCE_ONLY:
-        return f"Would delete {Path(filepath).name}"
+        return f"Would delete {name}"
     
     try:
-        # Validate file exists
-        if not os.path.exists(filepath):
-            return f"File not found: {filepath}"
-        
-        if not os.path.isfile(filepath):
-            return f"Not a file: {filepath}"
-        
-        os.remove(filepath)
-        return f"Deleted {Path(filepath).name}"
+        # No pre-check - os.unlink refuses folders itself (IsADirectoryError, or
+        # PermissionError on Windows), so only the failure path pays for a stat
+        os.unlink(filepath)
+        _clear_search_cache()
+        return f"Deleted {name}"
     except FileNotFoundError:
         return f"File not found: {filepath}"
-    except PermissionError:
-        return f"Permission denied: Cannot delete {Path(filepath).name}"
+    except (IsADirectoryError, PermissionError):
+        if os.path.isdir(filepath):
+            return f"Not a file: {filepath}"
+        return f"Permission denied: Cannot delete {name}"
     except Exception as e:
         return f"Error deleting file: {e}"
\ No newline at end of file